@@ -1,5 +1,12 @@
-from enum import Enum
+import concurrent.futures
+import contextlib
+import ctypes
+import fcntl
+import os
+import select
+import struct
 import time
+from collections.abc import Sequence
 
 import click
 import lgpio
@@ -10,9 +17,121 @@ from pocsag.pocsag import encodeTXBatch, encodeTransmission
 
 logger = structlog.get_logger()
 
-
-class BoardRegisters(Enum):
-    REG_01_OP_MODE = 0x01
+# FSK mode register addresses (p86)
+REG_00_FIFO = 0x00
+REG_01_OP_MODE = 0x01
+REG_02_BITRATE_MSB = 0x02
+# RegRxConfig, this is RegFifoAddrPtr in LoRa mode
+REG_0D_RX_CONFIG = 0x0d
+REG_25_PREAMBLE_MSB = 0x25
+REG_27_SYNC_CONFIG = 0x27
+REG_30_PACKET_CONFIG1 = 0x30
+REG_35_FIFO_THRESH = 0x35
+REG_3E_IRQ_FLAGS1 = 0x3e
+REG_3F_IRQ_FLAGS2 = 0x3f
+REG_40_DIO_MAPPING1 = 0x40
+REG_42_VERSION = 0x42
+
+# RegIrqFlags1 (0x3e) and RegIrqFlags2 (0x3f) bits, MSB first (p90)
+IRQ1_NAMES = (
+    "ModeReady", "RxReady", "TxReady", "PllLock",
+    "Rssi", "Timeout", "PreambleDetect", "SyncAddressMatch",
+)
+IRQ2_NAMES = (
+    "FifoFull", "FifoEmpty", "FifoLevel", "FifoOverrun",
+    "PacketSent", "PayloadReady", "CrcOk", "LowBat",
+)
+_IRQ1_BITS = tuple((name, 1 << i) for i, name in enumerate(reversed(IRQ1_NAMES)))
+_IRQ2_BITS = tuple((name, 1 << i) for i, name in enumerate(reversed(IRQ2_NAMES)))
+
+IRQ2_FIFO_FULL = 0x80
+IRQ2_FIFO_LEVEL = 0x20
+IRQ2_FIFO_OVERRUN = 0x10
+IRQ2_PACKET_SENT = 0x08
+
+# The SX1278 FIFO is 64 bytes in FSK mode, and we refill it once it drops
+# to FIFO_THRESHOLD bytes
+FIFO_SIZE = 64
+FIFO_THRESHOLD = 0x04
+FIFO_CHUNK_SIZE = FIFO_SIZE - FIFO_THRESHOLD
+
+# How long to wait before polling RegIrqFlags2 again while the FIFO drains.
+# A byte takes ~6.7ms to go out at 1200bps, so this is well inside the time
+# the FIFO threshold leaves us.
+FIFO_POLL_INTERVAL = 0.001
+# How long to wait for DIO1 to report FifoLevel before checking RegIrqFlags2
+# anyway, in case we missed the edge
+FIFO_EVENT_TIMEOUT = 0.02
+
+# Line event request from the v1 linux/gpio.h ABI, used to wait on DIO1
+# directly rather than through the lgpio callback thread
+GPIO_CHIP = "/dev/gpiochip0"
+GPIO_GET_LINEEVENT_IOCTL = 0xC030B404
+GPIOHANDLE_REQUEST_INPUT = 1 << 0
+GPIOHANDLE_REQUEST_BIAS_PULL_DOWN = 1 << 6
+GPIOEVENT_REQUEST_FALLING_EDGE = 1 << 1
+# struct gpioevent_request { lineoffset, handleflags, eventflags, consumer_label[32], fd }
+GPIOEVENT_REQUEST = struct.Struct("III32si")
+# sizeof(struct gpioevent_data)
+GPIOEVENT_DATA_SIZE = 16
+
+# struct spi_ioc_transfer from linux/spi/spidev.h, so several transfers can go
+# to the kernel in a single SPI_IOC_MESSAGE ioctl
+SPI_IOC_TRANSFER = struct.Struct("=QQIIHBBBBBB")
+
+
+def _spi_ioc_message(count: int) -> int:
+    # _IOW(SPI_IOC_MAGIC, 0, char[SPI_MSGSIZE(count)])
+    return (1 << 30) | ((count * SPI_IOC_TRANSFER.size) << 16) | (ord("k") << 8)
+
+
+# The CPU and SCHED_FIFO priority to feed the FIFO from, core 3 is the last
+# one on a Pi. If it isn't available we use the highest one we're allowed.
+TX_CPU = 3
+TX_PRIORITY = 50
+
+# Set frequency
+# 439.9875 is a licensed frequency (at least in the UK)
+# You must hold an amateur radio license to transmit on this frequency
+
+FSTEP = 32000000.0 / 524288
+# This is _actually_ 439.9875, but is offset for a reason I haven't
+# discovered yet. Validated with an SDR and an actual pager.
+FRF = int((439.99350 * 1000000) / FSTEP)
+#FRF = 0x6c8000
+
+# Register configuration written once the board is in FSK mode. Each entry
+# is a start register and the values burst written from it, they all go out
+# in one SPI_IOC_MESSAGE.
+_INIT_SEQUENCE = (
+    # Modem config, frequency and PA config, 0x02..0x09 are contiguous
+    # https://github.com/AaronJackson/rfm69-pocsag/blob/main/rfm69-pocsag/rfm69-pocsag.ino#L43
+    (REG_02_BITRATE_MSB, bytes([
+        0x68,  # RegBitrateMsb
+        0x2B,  # RegBitrateLsb
+        #0x06,  # RegBitrateMsb
+        #0x83,  # RegBitrateLsb
+        0x00,  # RegFdevMsb
+        0x4A,  # RegFdevLsb
+        (FRF >> 16) & 0xFF,  # RegFrfMsb
+        (FRF >> 8) & 0xFF,  # RegFrfMid
+        FRF & 0xFF,  # RegFrfLsb
+        (1 << 7) | (0x05) | (0x05),  # RegPaConfig
+    ])),
+    # 0 preamble length as we'll encode that ourselves, and no sync bits
+    (REG_25_PREAMBLE_MSB, bytes([
+        0x00,  # RegPreambleMsb
+        0x00,  # RegPreambleLsb
+        0x00,  # RegSyncConfig
+    ])),
+    # DIO0 to PacketSent and DIO1 to FifoLevel (p66)
+    (REG_40_DIO_MAPPING1, bytes([0x00])),
+)
+
+
+def _irq_flags(irq: int, bits: tuple[tuple[str, int], ...]) -> dict[str, bool]:
+    # Only for logging, check the IRQ2_* masks directly everywhere else
+    return {name: (irq & mask) != 0 for name, mask in bits}
 
 
 class Board:
@@ -27,47 +146,144 @@ class Board:
             gpio_level=gpio_level,
             timestamp=timestamp,
         )
-        first_read = self.spi_read(0x3e, 1)
-        first_irq =  [1 if first_read & (1 << (7-n)) else 0 for n in range(8)]
-        second_read = self.spi_read(0x3f, 1)
-        second_irq = [1 if second_read & (1 << (7-n)) else 0 for n in range(8)]
+        first_read = self.spi_read(REG_3E_IRQ_FLAGS1, 1)
+        second_read = self.spi_read(REG_3F_IRQ_FLAGS2, 1)
 
-        self.log.info("IRQ Flags", first_irq=first_irq, second_irq=second_irq)
+        self.log.debug(
+            "IRQ Flags",
+            first_irq=_irq_flags(first_read, _IRQ1_BITS),
+            second_irq=_irq_flags(second_read, _IRQ2_BITS),
+        )
 
-        if second_irq[4]:
+        if second_read & IRQ2_PACKET_SENT:
             self.is_transmitting = False
-            self.spi_write(BoardRegisters.REG_01_OP_MODE.value, 0x01)
+            self.spi_write_byte(REG_01_OP_MODE, 0x01)
+
+    def _request_line_event(self, pin: int) -> int:
+        request = bytearray(GPIOEVENT_REQUEST.pack(
+            pin,
+            GPIOHANDLE_REQUEST_INPUT | GPIOHANDLE_REQUEST_BIAS_PULL_DOWN,
+            GPIOEVENT_REQUEST_FALLING_EDGE,
+            b"pipager",
+            0,
+        ))
+        chip_fd = os.open(GPIO_CHIP, os.O_RDONLY)
+        try:
+            fcntl.ioctl(chip_fd, GPIO_GET_LINEEVENT_IOCTL, request)
+        finally:
+            os.close(chip_fd)
+
+        event_fd = GPIOEVENT_REQUEST.unpack(request)[4]
+        os.set_blocking(event_fd, False)
+        return event_fd
+
+    def _clear_fifo_level(self):
+        # Throw away any queued DIO1 edges, we only care that one happened
+        try:
+            os.read(self.fifo_event_fd, GPIOEVENT_DATA_SIZE * 16)
+        except BlockingIOError:
+            pass
+
+    @contextlib.contextmanager
+    def _realtime(self):
+        # Pin ourselves to one core at SCHED_FIFO priority while feeding the
+        # FIFO, so the scheduler can't leave it to underrun
+        affinity = os.sched_getaffinity(0)
+        policy = os.sched_getscheduler(0)
+        param = os.sched_getparam(0)
+
+        os.sched_setaffinity(0, {TX_CPU if TX_CPU in affinity else max(affinity)})
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(TX_PRIORITY))
+            is_realtime = True
+        except PermissionError:
+            self.log.warning("Unable to set realtime priority, are we root?")
+            is_realtime = False
+
+        try:
+            yield
+        finally:
+            if is_realtime:
+                os.sched_setscheduler(0, policy, param)
+            os.sched_setaffinity(0, affinity)
+
+    def _ndelay(self, ns: int):
+        # Busy wait, time.sleep overshoots microsecond delays by a long way
+        t = time.perf_counter_ns() + ns
+        while time.perf_counter_ns() < t:
+            pass
 
     def spi_read(self, register: int, length: int):
         if length == 1:
-            d = self.spi.xfer([register] + [0] * length)[1]
+            d = self._xfer2([register] + [0] * length)[1]
             return d
         else:
-            d = self.spi.xfer([register] + [0] * length)[1:]
+            d = self._xfer2([register] + [0] * length)[1:]
             return d
 
-    def spi_write(self, register: int, payload: bytes | int):
-        if type(payload) == int:
-            payload = [payload]
-            self.spi.xfer([register | 0x80] + payload)
-        else:
-            #self.log.info("Writing to register", register=register, payload=payload)
-            self.spi.xfer2([register | 0x80] + payload)
+    def spi_write_byte(self, register: int, value: int):
+        self._writebytes([register | 0x80, value])
+
+    def spi_write_bulk(self, register: int, payload: bytes | bytearray):
+        # Registers auto-increment, so the payload is written as a single
+        # burst starting at `register`
+        #self.log.info("Writing to register", register=register, payload=payload)
+        buf = bytearray(len(payload) + 1)
+        buf[0] = register | 0x80
+        buf[1:] = payload
+        self._writebytes2(buf)
+
+    def spi_write_many(self, transactions: Sequence[tuple[int, bytes]]):
+        # Burst write several (register, payload) pairs in one ioctl, with CS
+        # released between each one so every burst gets its own address.
+        # The buffers have to stay alive until the ioctl has returned.
+        buffers = []
+        message = bytearray()
+        for n, (register, payload) in enumerate(transactions):
+            buf = bytearray(len(payload) + 1)
+            buf[0] = register | 0x80
+            buf[1:] = payload
+            buffers.append(buf)
+
+            message += SPI_IOC_TRANSFER.pack(
+                ctypes.addressof((ctypes.c_char * len(buf)).from_buffer(buf)),  # tx_buf
+                0,  # rx_buf
+                len(buf),  # len
+                0,  # speed_hz, use max_speed_hz
+                0,  # delay_usecs
+                0,  # bits_per_word, use the device default
+                n < len(transactions) - 1,  # cs_change, but not after the last one
+                0,  # tx_nbits
+                0,  # rx_nbits
+                0,  # word_delay_usecs
+                0,  # pad
+            )
+
+        fcntl.ioctl(self.spi.fileno(), _spi_ioc_message(len(buffers)), message)
 
     def spi_raw_write(self, register: int, payload: bytes | int):
-        if type(payload) == int:
-            payload = [payload]
-        self.spi.xfer([register] + payload)
-
-    def __init__(self, spi_channel: int, interrupt_pin: int, reset_pin: int):
+        if isinstance(payload, int):
+            self._writebytes([register, payload])
+        else:
+            self._writebytes([register, *payload])
+
+    def __init__(
+        self,
+        spi_channel: int,
+        interrupt_pin: int,
+        reset_pin: int,
+        fifo_level_pin: int | None = None,
+    ):
         self.spi_channel = spi_channel
         self.interrupt_pin = interrupt_pin
         self.reset_pin = reset_pin
+        self.fifo_level_pin = fifo_level_pin
 
         self.log = logger.bind(
             spi_channel=self.spi_channel,
             interrupt_pin=self.interrupt_pin,
             reset_pin=self.reset_pin,
+            fifo_level_pin=self.fifo_level_pin,
         )
         self.log.info("Configuring board")
 
@@ -85,21 +301,45 @@ class Board:
             func=self._handle_interrupt,
         )
 
+        # DIO1 falling means the FIFO has drained below the threshold. We wait
+        # on that from the transmit loop itself, so it doesn't go through lgpio
+        if fifo_level_pin is not None:
+            self.fifo_event_fd = self._request_line_event(self.fifo_level_pin)
+            self.fifo_epoll = select.epoll()
+            self.fifo_epoll.register(self.fifo_event_fd, select.EPOLLIN)
+
+        # Opening spidev takes a few ms, so do it while the board comes out of
+        # reset. It only needs to be done before the first transfer.
+        self.spi = spidev.SpiDev()
+        spi_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="spi-open"
+        )
+        spi_opened = spi_executor.submit(self.spi.open, 0, self.spi_channel)
+        # The open still runs, this just lets the worker exit once it's done
+        spi_executor.shutdown(wait=False)
+
         # reset the board
         if reset_pin:
             self.log.info("Resetting board")
             lgpio.gpio_claim_output(self.GPIO_handle, reset_pin)
+            # Hold reset low for at least 100us, then give it 5ms to come
+            # back up before it'll talk to us (7.2.2)
             lgpio.gpio_write(self.GPIO_handle, reset_pin, lgpio.LOW)
-            time.sleep(0.01)
+            self._ndelay(200_000)
             lgpio.gpio_write(self.GPIO_handle, reset_pin, lgpio.HIGH)
-            time.sleep(0.01)
+            time.sleep(0.005)
             self.log.info("Reset complete")
 
-        self.spi = spidev.SpiDev()
-        self.spi.open(0, self.spi_channel)
+        # Re-raises anything open() hit, e.g. a missing /dev/spidev device
+        spi_opened.result()
         self.spi.max_speed_hz = 5000000
+        # Bind the transfer methods once, spi_read and the spi_write_*
+        # methods sit in the FIFO fill loop and are called for every chunk
+        self._xfer2 = self.spi.xfer2
+        self._writebytes = self.spi.writebytes
+        self._writebytes2 = self.spi.writebytes2
 
-        board_version = self.spi_read(0x42, 1)
+        board_version = self.spi_read(REG_42_VERSION, 1)
         self.log.info("Board version", board_version=board_version)
 
         if board_version != 0x12:
@@ -108,114 +348,123 @@ class Board:
             return
 
         # Set standby mode
-        self.spi_write(BoardRegisters.REG_01_OP_MODE.value, 0x01)
+        self.spi_write_byte(REG_01_OP_MODE, 0x01)
 
         # Sleep + FSK mode + FSK modulation = 00000000 (p87)
-        self.spi_write(BoardRegisters.REG_01_OP_MODE.value, 0x08)
+        self.spi_write_byte(REG_01_OP_MODE, 0x08)
         time.sleep(0.1)
 
         # The board defaults to LongRange (LoRa) mode, at 0x80
         # Lets check we actually wrote the change to FSK
-        op_mode = self.spi_read(BoardRegisters.REG_01_OP_MODE.value, 1)
+        op_mode = self.spi_read(REG_01_OP_MODE, 1)
         if op_mode != 0x08:
             self.log.error("Failed to set op mode", op_mode=op_mode)
             raise ValueError("Failed to set op mode")
 
 
-        # Set modem config
-        # https://github.com/AaronJackson/rfm69-pocsag/blob/main/rfm69-pocsag/rfm69-pocsag.ino#L43
-        self.spi_write(0x02, 0x68)  # RegBitrateMsb
-        self.spi_write(0x03, 0x2B)  # RegBitrateLsb
-        #self.spi_write(0x02, 0x06)  # RegBitrateMsb
-        #self.spi_write(0x03, 0x83)  # RegBitrateLsb
-        self.spi_write(0x04, 0x00)  # RegFdevMsb
-        self.spi_write(0x05, 0x4A)  # RegFdevLsb
+        # Write the precomputed modem configuration
+        self.spi_write_many(_INIT_SEQUENCE)
 
         self.log.info("Modem configured")
+        self.log.info("Frequency set", frf=hex(FRF))
 
-        # 0 preamble length as we'll encode that ourselves
-        self.spi_write(0x25, 0x00)
-        self.spi_write(0x26, 0x00)
-
-        # Set frequency
-        # 439.9875 is a licensed frequency (at least in the UK)
-        # You must hold an amateur radio license to transmit on this frequency
+    def encode(self, ric: str, message: str) -> bytes:
+        encode_log = self.log.bind(ric=ric, message=message)
+        encode_log.info("Encoding message", )
+        # Format = [ IsNumeric, Address(also supports A,B,C,D suffix like "133703C"), Message ]
+        data = bytes(encodeTXBatch([[False, ric, message]], inverted=False, repeatNum=1))
+        #data = encodeTransmission(False, 0, "1542350", )
+        encode_log.info("Encoded data", length=len(data))
+        return data
 
-        fstep = 32000000.0 / 524288
-        # This is _actually_ 439.9875, but is offset for a reason I haven't
-        # discovered yet. Validated with an SDR and an actual pager.
-        frf = int((439.99350 * 1000000) / fstep)
-        #frf = 0x6c8000
-        self.spi_write(0x06, (frf >> 16) & 0xFF)
-        self.spi_write(0x07, (frf >> 8) & 0xFF)
-        self.spi_write(0x08, frf & 0xFF)
+    def send_message(self, ric: str, message: str) -> bool:
+        data = self.encode(ric, message)
 
-        self.log.info("Frequency set", frf=hex(frf))
+        with open("pi-hacktheplanet", 'wb') as f:
+            f.write(data)
 
-        val = (1 << 7) | (0x05) | (0x05)
-        self.spi_write(0x09, val)
+        return self.transmit(data)
 
-    def send_message(self, ric: str, message: str) -> bool:
-        # encode a test
-        send_log = self.log.bind(ric=ric, message=message)
-        send_log.info("Encoding message", )
-        # Format = [ IsNumeric, Address(also supports A,B,C,D suffix like "133703C"), Message ]
-        data = encodeTXBatch([[False, ric, message]], inverted=False, repeatNum=1)
-        #data = encodeTransmission(False, 0, "1542350", )
-        send_log.info("Encoded data", data=data, length=len(data))
+    def transmit(self, data: bytes) -> bool:
+        send_log = self.log.bind(length=len(data))
+        send_log.info("Transmitting data")
 
         # Disable CRC checking as we do that ourselves via POCSAG
-        self.spi_write(0x30, 0x80)
-
-        # Set FiFo threshold to 32 bytes
-        self.spi_write(0x35, 0xa0)
+        self.spi_write_byte(REG_30_PACKET_CONFIG1, 0x80)
 
         # Turn off the sync bits
-        self.spi_write(0x27, 0x0)
+        self.spi_write_byte(REG_27_SYNC_CONFIG, 0x0)
 
-        # Set exit condition to FiFo empty
-        self.spi_write(0x35, 0x04)
+        # TxStartCondition = FifoLevel, with the FifoLevel threshold the
+        # refill loop waits on (it refills once the FIFO drops to this)
+        self.spi_write_byte(REG_35_FIFO_THRESH, FIFO_THRESHOLD)
 
-        # Set to beginning of Fifo
-        self.spi_write(0x0d, 0)
+        # Clear RegRxConfig, which turns off the RX restart, AFC/AGC and RX
+        # trigger options. This is a leftover from LoRa mode, where 0x0d is
+        # RegFifoAddrPtr and this reset the FIFO pointer; it doesn't matter
+        # for TX in FSK mode.
+        self.spi_write_byte(REG_0D_RX_CONFIG, 0)
 
         # briefly set RX Mode to clear Fifo
-        self.spi_write(0x01, 0x05)
+        self.spi_write_byte(REG_01_OP_MODE, 0x05)
         time.sleep(0.1)
         # Set standby mode
-        self.spi_write(BoardRegisters.REG_01_OP_MODE.value, 0x01)
+        self.spi_write_byte(REG_01_OP_MODE, 0x01)
 
         self.is_transmitting = True
 
-        with open("pi-hacktheplanet", 'wb') as f:
-            f.write(bytes(data))
-
-        is_first_data = True
-        num_bytes = 0
-
-        while(num_bytes < len(data)):
-            irq_flags = [1 if self.spi_read(0x3f, 1) & (1 << (7-n)) else 0 for n in range(8)]
-            fifo_full = irq_flags[0]
-            fifo_level = irq_flags[2]
-            fifo_overrun = irq_flags[3]
-
-            if fifo_overrun:
+        if len(data) <= FIFO_SIZE:
+            # It all fits, so write it in one burst and let it go
+            self.spi_write_bulk(REG_00_FIFO, data)
+            send_log.info("TX Mode")
+            self.spi_write_byte(REG_01_OP_MODE, 0x03)
+            return True
+
+        with self._realtime():
+            return self._fill_fifo(data, send_log)
+
+    def _fill_fifo(self, data: bytes, send_log) -> bool:
+        num_bytes = FIFO_CHUNK_SIZE
+        data_length = len(data)
+
+        # Bind everything the loop touches to locals, it runs for every chunk
+        spi_read = self.spi_read
+        spi_write_byte = self.spi_write_byte
+        spi_write_bulk = self.spi_write_bulk
+        use_fifo_interrupt = self.fifo_level_pin is not None
+        if use_fifo_interrupt:
+            fifo_poll = self.fifo_epoll.poll
+            clear_fifo_level = self._clear_fifo_level
+            clear_fifo_level()
+
+        # The FIFO has just been cleared, so fill it and set the DIO0 to Tx
+        spi_write_bulk(REG_00_FIFO, data[:FIFO_CHUNK_SIZE])
+        send_log.info("TX Mode")
+        spi_write_byte(REG_01_OP_MODE, 0x03)
+
+        # Nothing in here should log or format strings until we're done, the
+        # FIFO has to be refilled before it drains
+        while(num_bytes < data_length):
+            if use_fifo_interrupt:
+                if fifo_poll(FIFO_EVENT_TIMEOUT):
+                    clear_fifo_level()
+
+            irq_flags = spi_read(REG_3F_IRQ_FLAGS2, 1)
+
+            if irq_flags & IRQ2_FIFO_OVERRUN:
                 send_log.error("Fifo overrun")
                 return False
 
-            # It's not full, and we still have some data to send
-            if fifo_full or fifo_level:
+            # It's not drained below the threshold yet, give it a moment
+            # rather than hammering the bus with status reads
+            if irq_flags & (IRQ2_FIFO_FULL | IRQ2_FIFO_LEVEL):
+                if not use_fifo_interrupt:
+                    time.sleep(FIFO_POLL_INTERVAL)
                 continue
 
             # Write the data to the FIFO
-            self.spi_write(0x00, data[num_bytes:num_bytes+32])
-            num_bytes += 32
-
-            # If this is the first data, set the DIO0 to Tx
-            if is_first_data:
-                send_log.info("TX Mode")
-                self.spi_write(0x01, 0x03)
-                is_first_data = False
+            spi_write_bulk(REG_00_FIFO, data[num_bytes:num_bytes+FIFO_CHUNK_SIZE])
+            num_bytes += FIFO_CHUNK_SIZE
 
         return True
 
@@ -224,11 +473,17 @@ class Board:
 @click.option("--spi-channel", default=1, help="SPI Channel for the LoRa chip")
 @click.option("--interrupt-pin", default=16, help="Interupt pin for the LoRa chip")
 @click.option("--reset-pin", default=12, help="Reset pin for the LoRa chip")
-def run(spi_channel, interrupt_pin, reset_pin):
-    board = Board(spi_channel, interrupt_pin, reset_pin)
+@click.option(
+    "--fifo-level-pin",
+    default=None,
+    type=int,
+    help="DIO1 pin for the LoRa chip, the FIFO is polled if not set",
+)
+def run(spi_channel, interrupt_pin, reset_pin, fifo_level_pin):
+    board = Board(spi_channel, interrupt_pin, reset_pin, fifo_level_pin)
     board.send_message("1542350", "This is a test message")
     time.sleep(5)
-    board.spi_write(BoardRegisters.REG_01_OP_MODE.value, 0x01)
+    board.spi_write_byte(REG_01_OP_MODE, 0x01)
 
 
 if __name__ == "__main__":